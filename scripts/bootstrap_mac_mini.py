@@ -4,19 +4,45 @@
 from __future__ import annotations
 
 import json
-import shutil
-import subprocess
-from pathlib import Path
+import os
+import sys
+from typing import Dict, Iterable, Tuple
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src._http import SESSION
+from src._paths import ROOT
+from src.model_router import load_config
 
-ROOT = Path(__file__).resolve().parents[1]
 ENV_PATH = ROOT / ".env"
 ENV_EXAMPLE = ROOT / ".env.example"
 STACK_EXAMPLE = ROOT / "config" / "agent_stack.example.json"
 STACK_PATH = ROOT / "config" / "agent_stack.json"
+OLLAMA_TAGS_URL = "http://127.0.0.1:11434/api/tags"
+REQUIRED_TOOLS = ("python3", "ollama", "git")
 
 
-def command_exists(name: str) -> bool:
-    return shutil.which(name) is not None
+def _scan_path_for(names: Iterable[str]) -> Dict[str, bool]:
+    """Find several executables with one walk over PATH."""
+    wanted = tuple(names)
+    pending = set(wanted)
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        if not pending:
+            break
+        try:
+            with os.scandir(directory or os.curdir) as entries:
+                for entry in entries:
+                    if (
+                        entry.name in pending
+                        and entry.is_file()
+                        and os.access(entry.path, os.X_OK)
+                    ):
+                        pending.discard(entry.name)
+        except OSError:
+            continue
+    return {name: name not in pending for name in wanted}
 
 
 def write_env_if_missing() -> bool:
@@ -26,37 +52,23 @@ def write_env_if_missing() -> bool:
     return True
 
 
-def write_stack_if_missing() -> bool:
+def write_stack_if_missing() -> Tuple[bool, str]:
     if STACK_PATH.exists():
-        return False
-    STACK_PATH.write_text(STACK_EXAMPLE.read_text(encoding="utf-8"), encoding="utf-8")
-    return True
-
-
-def read_json(path: Path):
-    return json.loads(path.read_text(encoding="utf-8"))
+        return False, ""
+    text = STACK_EXAMPLE.read_text(encoding="utf-8")
+    STACK_PATH.write_text(text, encoding="utf-8")
+    return True, text
 
 
 def health_snapshot() -> dict:
-    checks = {
-        "python3": command_exists("python3"),
-        "ollama": command_exists("ollama"),
-        "git": command_exists("git"),
-    }
-
-    ollama_running = False
-    if checks["ollama"]:
-        try:
-            run = subprocess.run(
-                ["ollama", "list"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                check=False,
-            )
-            ollama_running = run.returncode == 0
-        except Exception:
-            ollama_running = False
+    checks = _scan_path_for(REQUIRED_TOOLS)
+
+    try:
+        # Only the status matters; stream=True skips downloading the model list.
+        with SESSION.get(OLLAMA_TAGS_URL, timeout=0.5, stream=True) as response:
+            ollama_running = response.ok
+    except requests.RequestException:
+        ollama_running = False
 
     checks["ollama_reachable"] = ollama_running
     return checks
@@ -64,10 +76,11 @@ def health_snapshot() -> dict:
 
 def main() -> int:
     env_created = write_env_if_missing()
-    stack_created = write_stack_if_missing()
+    stack_created, stack_text = write_stack_if_missing()
 
-    providers = read_json(ROOT / "config" / "providers.json")
-    stack = read_json(STACK_PATH if STACK_PATH.exists() else STACK_EXAMPLE)
+    providers = load_config(ROOT / "config" / "providers.json")
+    # A freshly written stack is a copy of the example; parse the text we already hold.
+    stack = json.loads(stack_text) if stack_created else load_config(STACK_PATH)
 
     print("== Mac mini bootstrap summary ==")
     print(f"Created .env: {'yes' if env_created else 'no (already existed)'}")
@@ -88,10 +101,12 @@ def main() -> int:
         f"Worker default: {stack['worker_defaults']['provider']}/{stack['worker_defaults']['model']}"
     )
 
-    if not health["ollama"]:
-        print("\nInstall local model runtime: brew install ollama")
-    elif not health["ollama_reachable"]:
-        print("\nStart local model runtime: ollama serve")
+    # A daemon started from the app bundle answers on the port without being on PATH.
+    if not health["ollama_reachable"]:
+        if health["ollama"]:
+            print("\nStart local model runtime: ollama serve")
+        else:
+            print("\nInstall local model runtime: brew install ollama")
 
     default = providers["defaults"]
     print(
@@ -3,15 +3,22 @@
 
 from __future__ import annotations
 
+import argparse
 import os
+import socket
 import sys
-import urllib.request
-from pathlib import Path
+from typing import Dict
+from urllib.parse import urlparse
 
-ROOT = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(ROOT))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.model_router import ModelResolutionError, load_config, resolve_runtime_model
+from src.model_router import (
+    ModelResolutionError,
+    ResolvedModel,
+    load_config,
+    prebuild_alias_map,
+    resolve_runtime_model,
+)
 
 
 def check_env_keys() -> dict:
@@ -24,13 +31,36 @@ def check_env_keys() -> dict:
 
 def check_local_endpoint(url: str) -> bool:
     try:
-        with urllib.request.urlopen(url, timeout=2) as resp:
-            return 200 <= resp.status < 500
-    except Exception:
+        # urlparse and .port raise ValueError on malformed URLs (bad port, IPv6 brackets).
+        parsed = urlparse(url)
+        if not parsed.hostname:
+            return False
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        with socket.create_connection((parsed.hostname, port), timeout=0.5):
+            return True
+    except (OSError, ValueError):
         return False
 
 
+def _safe_resolve(alias_name: str, config: Dict) -> ResolvedModel | ModelResolutionError:
+    try:
+        return resolve_runtime_model(requested_model=alias_name, config=config)
+    except ModelResolutionError as exc:
+        return exc
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check provider/model routing and local wiring.")
+    parser.add_argument(
+        "--check-parity",
+        action="store_true",
+        help="Also resolve each alias individually and compare with the prebuilt map.",
+    )
+    return parser.parse_args()
+
+
 def main() -> int:
+    args = parse_args()
     config = load_config()
 
     print("== Model resolution checks ==")
@@ -41,15 +71,22 @@ def main() -> int:
         print(f"- default: ERROR -> {exc}")
         return 1
 
-    aliases = config.get("aliases", {})
-    for alias_name in aliases:
-        try:
-            result = resolve_runtime_model(requested_model=alias_name, config=config)
-            source = "fallback" if result.from_fallback else "direct"
-            print(f"- alias '{alias_name}': OK -> {result.provider}/{result.model} ({source})")
-        except ModelResolutionError as exc:
-            print(f"- alias '{alias_name}': ERROR -> {exc}")
-            return 1
+    prebuilt = prebuild_alias_map(config)
+
+    alias_failed = False
+    for alias_name, result in prebuilt.items():
+        if args.check_parity and repr(_safe_resolve(alias_name, config)) != repr(result):
+            print(f"- alias '{alias_name}': ERROR -> prebuilt result differs from direct resolution")
+            alias_failed = True
+            continue
+        if isinstance(result, ModelResolutionError):
+            print(f"- alias '{alias_name}': ERROR -> {result}")
+            alias_failed = True
+            continue
+        source = "fallback" if result.from_fallback else "direct"
+        print(f"- alias '{alias_name}': OK -> {result.provider}/{result.model} ({source})")
+    if alias_failed:
+        return 1
 
     print("\n== Environment checks ==")
     env_status = check_env_keys()
@@ -3,51 +3,107 @@
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
 import os
 import sys
-import urllib.error
-import urllib.request
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
 
+import requests
 
-def _load_env() -> None:
-    env_file = Path('.env')
-    if not env_file.exists():
-        return
-    for raw in env_file.read_text(encoding='utf-8').splitlines():
-        line = raw.strip()
-        if not line or line.startswith('#') or '=' not in line:
-            continue
-        key, val = line.split('=', 1)
-        os.environ.setdefault(key.strip(), val.strip())
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src._env import load_dotenv  # noqa: E402
+from src._http import SESSION  # noqa: E402
 
-def _get(url: str, headers: Dict[str, str] | None = None, timeout: int = 10) -> Tuple[bool, str, Dict]:
-    req = urllib.request.Request(url, headers=headers or {})
+CACHE_PATH = Path.home() / '.cache' / 'openclaw' / 'preflight.json'
+CACHE_TTL_S = 300
+
+_CACHE_ENABLED = True
+_CACHE_LOCK = threading.Lock()
+
+
+def _get(
+    url: str,
+    headers: Dict[str, str] | None = None,
+    timeout: int = 10,
+    method: str = 'GET',
+) -> Tuple[bool, str, Dict]:
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            payload = json.loads(resp.read().decode('utf-8') or '{}')
-            return True, f"HTTP {resp.status}", payload
-    except urllib.error.HTTPError as exc:
-        return False, f"HTTP {exc.code}", {}
-    except Exception as exc:
+        resp = SESSION.request(method, url, headers=headers or {}, timeout=timeout)
+        if not resp.ok:
+            return False, f"HTTP {resp.status_code}", {}
+        payload = resp.json() if resp.content else {}
+        return True, f"HTTP {resp.status_code}", payload
+    except (requests.RequestException, ValueError) as exc:
         return False, str(exc), {}
 
 
+def _read_cache() -> Dict:
+    try:
+        cache = json.loads(CACHE_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _cached_check(
+    name: str,
+    key_value: str,
+    fn: Callable[[], Tuple[bool, str]],
+    ttl: int = CACHE_TTL_S,
+) -> Tuple[bool, str]:
+    """Reuse a recent successful validation of the same credential."""
+    if not _CACHE_ENABLED:
+        return fn()
+
+    digest = hashlib.sha256(f'{name}:{key_value}'.encode('utf-8')).hexdigest()
+    entry = _read_cache().get(digest)
+    # The cache file may be hand-edited or corrupt; anything malformed is a miss.
+    if isinstance(entry, dict):
+        ts = entry.get('ts')
+        if isinstance(ts, (int, float)) and not isinstance(ts, bool) and time.time() - ts < ttl:
+            return True, f"{entry.get('msg', 'OK')} (cached)"
+
+    ok, msg = fn()
+    if not ok:
+        return ok, msg
+
+    with _CACHE_LOCK:
+        cache = _read_cache()
+        cache[digest] = {'ts': time.time(), 'msg': msg}
+        try:
+            CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp = CACHE_PATH.with_suffix('.tmp')
+            tmp.write_text(json.dumps(cache), encoding='utf-8')
+            tmp.replace(CACHE_PATH)
+        except OSError:
+            pass
+    return ok, msg
+
+
 def check_anthropic() -> Tuple[bool, str]:
     token = os.getenv('ANTHROPIC_SESSION_TOKEN', '').strip()
     if not token:
         return False, 'Missing ANTHROPIC_SESSION_TOKEN'
-    ok, msg, _ = _get(
-        'https://api.anthropic.com/v1/models',
-        headers={
-            'x-api-key': token,
-            'anthropic-version': '2023-06-01'
-        },
-        timeout=12,
-    )
+    return _cached_check('anthropic', token, lambda: _probe_anthropic(token))
+
+
+def _probe_anthropic(token: str) -> Tuple[bool, str]:
+    url = 'https://api.anthropic.com/v1/models'
+    headers = {
+        'x-api-key': token,
+        'anthropic-version': '2023-06-01'
+    }
+    # HEAD validates the key without downloading the model listing.
+    ok, msg, _ = _get(url, headers=headers, timeout=12, method='HEAD')
+    if msg == 'HTTP 405':
+        ok, msg, _ = _get(url, headers=headers, timeout=12)
     if ok:
         return True, 'Anthropic token accepted by /v1/models'
     return False, f'Anthropic check failed ({msg}). If using subscription-session token only, validate via OpenClaw bridge.'
@@ -57,8 +113,12 @@ def check_google() -> Tuple[bool, str]:
     key = os.getenv('GOOGLE_API_KEY', '').strip()
     if not key:
         return False, 'Missing GOOGLE_API_KEY'
+    return _cached_check('google', key, lambda: _probe_google(key))
+
+
+def _probe_google(key: str) -> Tuple[bool, str]:
     ok, msg, _ = _get(
-        f'https://generativelanguage.googleapis.com/v1beta/models?key={key}',
+        f'https://generativelanguage.googleapis.com/v1beta/models?key={key}&pageSize=1',
         timeout=12,
     )
     if ok:
@@ -81,6 +141,10 @@ def check_discord_bot() -> Tuple[bool, str]:
     token = os.getenv('DISCORD_BOT_TOKEN', '').strip()
     if not token:
         return False, 'Missing DISCORD_BOT_TOKEN'
+    return _cached_check('discord', token, lambda: _probe_discord_bot(token))
+
+
+def _probe_discord_bot(token: str) -> Tuple[bool, str]:
     ok, msg, payload = _get(
         'https://discord.com/api/v10/users/@me',
         headers={'Authorization': f'Bot {token}'},
@@ -92,14 +156,35 @@ def check_discord_bot() -> Tuple[bool, str]:
     return False, f'Discord bot check failed ({msg})'
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Validate provider credentials and local runtime.')
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Revalidate credentials even if they passed within the last {CACHE_TTL_S}s.',
+    )
+    return parser.parse_args()
+
+
 def main() -> int:
-    _load_env()
-    checks: List[Tuple[str, Tuple[bool, str]]] = [
-        ('Anthropic', check_anthropic()),
-        ('Google Gemini', check_google()),
-        ('Ollama', check_ollama()),
-        ('Discord Bot', check_discord_bot()),
+    global _CACHE_ENABLED
+
+    args = parse_args()
+    _CACHE_ENABLED = not args.no_cache
+    load_dotenv()
+    named_checks = [
+        ('Anthropic', check_anthropic),
+        ('Google Gemini', check_google),
+        ('Ollama', check_ollama),
+        ('Discord Bot', check_discord_bot),
     ]
+    # Each check is one network round-trip; run them side by side so the
+    # total wait is the slowest check rather than the sum of all of them.
+    with ThreadPoolExecutor(max_workers=len(named_checks)) as pool:
+        futures = [(name, pool.submit(fn)) for name, fn in named_checks]
+        checks: List[Tuple[str, Tuple[bool, str]]] = [
+            (name, future.result()) for name, future in futures
+        ]
 
     has_fail = False
     print('OpenClaw Mac Mini Preflight Results')
@@ -4,17 +4,10 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-
-from src.model_router import (
-    ModelResolutionError,
-    resolve_runtime_model,
-    validate_environment,
-)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 def parse_args() -> argparse.Namespace:
@@ -45,10 +38,18 @@ def parse_args() -> argparse.Namespace:
 def main() -> int:
     args = parse_args()
 
+    # Deferred so --help and argument errors return without importing the router.
+    from src._json import dumps_pretty
+    from src.model_router import (
+        ModelResolutionError,
+        resolve_runtime_model,
+        validate_environment,
+    )
+
     if args.preflight:
         issues = validate_environment()
         if args.json:
-            print(json.dumps({"ok": len(issues) == 0, "issues": issues}, indent=2))
+            print(dumps_pretty({"ok": len(issues) == 0, "issues": issues}))
         else:
             if issues:
                 print("PREFLIGHT FAIL")
@@ -70,7 +71,7 @@ def main() -> int:
         )
     except ModelResolutionError as exc:
         if args.json:
-            print(json.dumps({"ok": False, "error": str(exc)}, indent=2))
+            print(dumps_pretty({"ok": False, "error": str(exc)}))
         else:
             print(f"ERROR: {exc}")
         return 1
@@ -84,7 +85,7 @@ def main() -> int:
     }
 
     if args.json:
-        print(json.dumps(payload, indent=2))
+        print(dumps_pretty(payload))
     else:
         print(
             "OK: "
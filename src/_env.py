@@ -0,0 +1,23 @@
+"""Minimal .env loader shared by the CLI scripts."""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Dict
+
+_ASSIGNMENT = re.compile(r"(?m)^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$")
+
+
+def load_dotenv(path: str | Path = ".env") -> Dict[str, str]:
+    """Parse KEY=VALUE lines from ``path`` without overriding existing env vars."""
+    env_path = Path(path)
+    if not env_path.exists():
+        return {}
+
+    values: Dict[str, str] = {}
+    for key, value in _ASSIGNMENT.findall(env_path.read_text(encoding="utf-8")):
+        values.setdefault(key, value)
+        os.environ.setdefault(key, value)
+    return values
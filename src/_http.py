@@ -0,0 +1,11 @@
+"""Shared keep-alive HTTP session for CLI checks and alerts."""
+
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
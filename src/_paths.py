@@ -0,0 +1,9 @@
+"""Repository paths computed once per process."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+# abspath rather than resolve(): no symlink walk over every ancestor directory.
+ROOT = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
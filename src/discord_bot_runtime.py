@@ -3,21 +3,45 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import logging.handlers
 import os
+import queue
+import signal
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
+import aiohttp
 import discord
-import requests
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 
+from src import _json
 from src.discord_interface import send_discord_alert
 from src.model_router import load_config
 
 LOGGER = logging.getLogger("ace_discord_bot")
 
+RESPONSE_CACHE_MAX_ENTRIES = 256
+REQUEST_QUEUE_SIZE = 64
+REQUEST_WORKERS = 8
+ALERT_QUEUE_SIZE = 32
+DISCORD_CHUNK_SIZE = 1900
+# Sent for a bare mention; asks about live fallback state, so never cached.
+STATUS_PROMPT = "Hello ACE. Please share your current status."
+
+TextSink = Callable[[str], Awaitable[None]]
+
+# Shared keep-alive pool for provider HTTP calls; owned by run_discord_bot.
+_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
+_ANTHROPIC_CLIENT: Optional[AsyncAnthropic] = None
+
+# Pending webhook alerts, drained by one background worker; owned by run_discord_bot.
+_ALERT_QUEUE: "Optional[asyncio.Queue[Tuple[str, str, str, Dict]]]" = None
+
 
 @dataclass(frozen=True)
 class Candidate:
@@ -25,7 +49,7 @@ class Candidate:
     model: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BotRuntimeConfig:
     token: str
     anthropic_key: str
@@ -34,14 +58,16 @@ class BotRuntimeConfig:
     role: str
     timeout: int
     respond_in_all_channels: bool
-    allowed_channels: set[int]
+    allowed_channels: frozenset[int]
+    response_cache_ttl: int
+    candidates: Tuple[Candidate, ...]
 
 
 class ModelCallError(RuntimeError):
     pass
 
 
-def _parse_allowed_channels(value: str) -> set[int]:
+def _parse_allowed_channels(value: str) -> frozenset[int]:
     out: set[int] = set()
     for item in value.split(","):
         item = item.strip()
@@ -51,9 +77,10 @@ def _parse_allowed_channels(value: str) -> set[int]:
             out.add(int(item))
         except ValueError:
             LOGGER.warning("Skipping invalid channel ID in ACE_ALLOWED_CHANNEL_IDS: %s", item)
-    return out
+    return frozenset(out)
 
 
+@functools.cache
 def load_runtime_config() -> BotRuntimeConfig:
     load_dotenv(dotenv_path=".env")
     token = os.getenv("DISCORD_BOT_TOKEN", "").strip()
@@ -72,6 +99,8 @@ def load_runtime_config() -> BotRuntimeConfig:
         timeout=timeout,
         respond_in_all_channels=os.getenv("ACE_RESPOND_IN_ALL_CHANNELS", "false").lower() == "true",
         allowed_channels=_parse_allowed_channels(os.getenv("ACE_ALLOWED_CHANNEL_IDS", "")),
+        response_cache_ttl=int(os.getenv("ACE_RESPONSE_CACHE_TTL", "30")),
+        candidates=tuple(role_candidates(role)),
     )
 
 
@@ -105,58 +134,122 @@ def _extract_anthropic_text(response) -> str:
     return joined or "(No content returned.)"
 
 
-def call_anthropic(model: str, prompt: str, cfg: BotRuntimeConfig) -> str:
+def _get_anthropic(cfg: BotRuntimeConfig) -> AsyncAnthropic:
+    """Return the process-wide Anthropic client, rebuilding it if the key changed."""
+    global _ANTHROPIC_CLIENT
+    if _ANTHROPIC_CLIENT is None or _ANTHROPIC_CLIENT.api_key != cfg.anthropic_key:
+        _ANTHROPIC_CLIENT = AsyncAnthropic(api_key=cfg.anthropic_key)
+    return _ANTHROPIC_CLIENT
+
+
+async def call_anthropic(
+    model: str,
+    prompt: str,
+    cfg: BotRuntimeConfig,
+    on_text: Optional[TextSink] = None,
+) -> str:
     if not cfg.anthropic_key:
         raise ModelCallError("ANTHROPIC_API_KEY is not set")
 
-    client = Anthropic(api_key=cfg.anthropic_key)
-    response = client.messages.create(
+    async with _get_anthropic(cfg).messages.stream(
         model=model,
         max_tokens=700,
         messages=[{"role": "user", "content": prompt}],
-    )
+    ) as stream:
+        async for text in stream.text_stream:
+            if on_text is not None:
+                await on_text(text)
+        response = await stream.get_final_message()
     return _extract_anthropic_text(response)
 
 
-def call_ollama(model: str, prompt: str, cfg: BotRuntimeConfig) -> str:
+async def call_ollama(
+    model: str,
+    prompt: str,
+    cfg: BotRuntimeConfig,
+    on_text: Optional[TextSink] = None,
+) -> str:
+    if _HTTP_SESSION is None:
+        raise ModelCallError("HTTP session is not initialised; start the bot via run_discord_bot")
+
     endpoint = cfg.local_openai_base_url.rstrip("/") + "/chat/completions"
     payload = {
         "model": model,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0.4,
+        "stream": True,
     }
-    response = requests.post(endpoint, json=payload, timeout=cfg.timeout)
-    if response.status_code >= 400:
-        raise ModelCallError(f"Ollama request failed: HTTP {response.status_code} {response.text[:200]}")
+    parts: List[str] = []
+    async with _HTTP_SESSION.post(
+        endpoint,
+        json=payload,
+        timeout=aiohttp.ClientTimeout(total=cfg.timeout),
+    ) as response:
+        if response.status >= 400:
+            body = await response.text()
+            raise ModelCallError(f"Ollama request failed: HTTP {response.status} {body[:200]}")
+
+        # OpenAI-compatible server-sent events: one "data: {...}" line per delta.
+        async for raw in response.content:
+            line = raw.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            try:
+                chunk = _json.loads(data)
+                text = chunk["choices"][0].get("delta", {}).get("content") or ""
+            except Exception as exc:  # noqa: BLE001
+                raise ModelCallError(f"Unexpected Ollama response shape: {data[:200]!r}") from exc
+            if text:
+                parts.append(text)
+                if on_text is not None:
+                    await on_text(text)
 
-    data = response.json()
-    try:
-        return data["choices"][0]["message"]["content"].strip()
-    except Exception as exc:  # noqa: BLE001
-        raise ModelCallError(f"Unexpected Ollama response shape: {data}") from exc
+    return "".join(parts).strip()
 
 
-def invoke_candidate(candidate: Candidate, prompt: str, cfg: BotRuntimeConfig) -> str:
+async def invoke_candidate(
+    candidate: Candidate,
+    prompt: str,
+    cfg: BotRuntimeConfig,
+    on_text: Optional[TextSink] = None,
+) -> str:
     if candidate.provider == "anthropic":
-        return call_anthropic(candidate.model, prompt, cfg)
+        return await call_anthropic(candidate.model, prompt, cfg, on_text)
     if candidate.provider == "ollama":
-        return call_ollama(candidate.model, prompt, cfg)
+        return await call_ollama(candidate.model, prompt, cfg, on_text)
     raise ModelCallError(f"Unsupported provider in runtime: {candidate.provider}")
 
 
-def complete_with_fallback(prompt: str, cfg: BotRuntimeConfig) -> Tuple[str, Candidate]:
+async def complete_with_fallback(
+    prompt: str,
+    cfg: BotRuntimeConfig,
+    relay: Optional[_StreamRelay] = None,
+) -> Tuple[str, Candidate]:
     errors: List[str] = []
-    for candidate in role_candidates(cfg.role):
+    for candidate in cfg.candidates:
+        on_text = None
+        if relay is not None:
+            relay.begin(candidate)
+            on_text = relay.feed
         try:
-            answer = invoke_candidate(candidate, prompt, cfg)
+            answer = await invoke_candidate(candidate, prompt, cfg, on_text)
             LOGGER.info("Selected %s/%s", candidate.provider, candidate.model)
             return answer, candidate
         except Exception as exc:  # noqa: BLE001
+            if relay is not None and relay.sent_any:
+                # Part of this answer is already in the channel; a fallback
+                # would post a second, unrelated answer underneath it.
+                raise _StreamInterrupted(
+                    f"{candidate.provider}/{candidate.model} failed mid-stream: {exc}"
+                ) from exc
             error = f"{candidate.provider}/{candidate.model}: {exc}"
             LOGGER.warning("Candidate failed: %s", error)
             errors.append(error)
 
-    send_discord_alert(
+    await _dispatch_alert(
         cfg.alert_webhook,
         title="Open Fall Triggered",
         description="All ACE role providers failed during Discord request.",
@@ -165,25 +258,231 @@ def complete_with_fallback(prompt: str, cfg: BotRuntimeConfig) -> Tuple[str, Can
     raise ModelCallError("All fallback candidates failed. Check provider credentials and connectivity.")
 
 
+_RESPONSE_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, str, Candidate]]" = OrderedDict()
+_INFLIGHT: Dict[Tuple[str, str], "asyncio.Future[Tuple[str, Candidate]]"] = {}
+
+
+def _response_cache_key(role: str, prompt: str) -> Tuple[str, str]:
+    # Case and whitespace differences should not defeat the cache.
+    return role, " ".join(prompt.casefold().split())
+
+
+async def cached_completion(
+    prompt: str,
+    cfg: BotRuntimeConfig,
+    relay: Optional[_StreamRelay] = None,
+) -> Tuple[str, Candidate]:
+    """Serve repeated prompts from a short-lived cache before calling providers.
+
+    Identical prompts that arrive while a request is already in flight wait for
+    that request instead of issuing their own upstream call. Only the caller
+    that actually reaches a provider streams into its ``relay``.
+    """
+    key = _response_cache_key(cfg.role, prompt)
+    cacheable = cfg.response_cache_ttl > 0 and prompt != STATUS_PROMPT
+    if cacheable:
+        hit = _RESPONSE_CACHE.get(key)
+        if hit and time.monotonic() - hit[0] < cfg.response_cache_ttl:
+            _RESPONSE_CACHE.move_to_end(key)
+            return hit[1], hit[2]
+
+    while (pending := _INFLIGHT.get(key)) is not None:
+        try:
+            return await asyncio.shield(pending)
+        except _StreamInterrupted:
+            # The leader could not fall back because it had already posted
+            # part of its answer; this caller has posted nothing, so it can.
+            continue
+        except asyncio.CancelledError:
+            # A cancelled leader cancels its future; unless this task was the
+            # one cancelled, take over the request instead of dying with it.
+            if pending.cancelled() and not asyncio.current_task().cancelling():
+                continue
+            raise
+
+    future: "asyncio.Future[Tuple[str, Candidate]]" = asyncio.get_running_loop().create_future()
+    _INFLIGHT[key] = future
+    try:
+        answer, candidate = await complete_with_fallback(prompt, cfg, relay)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:  # noqa: BLE001
+        future.set_exception(exc)
+        future.exception()  # waiters re-raise it; don't warn when there are none
+        raise
+    else:
+        future.set_result((answer, candidate))
+    finally:
+        _INFLIGHT.pop(key, None)
+
+    if not cacheable:
+        return answer, candidate
+    _RESPONSE_CACHE[key] = (time.monotonic(), answer, candidate)
+    _RESPONSE_CACHE.move_to_end(key)
+    while len(_RESPONSE_CACHE) > RESPONSE_CACHE_MAX_ENTRIES:
+        _RESPONSE_CACHE.popitem(last=False)
+    return answer, candidate
+
+
+@functools.lru_cache(maxsize=4)
+def _mention_tags(bot_user_id: int) -> Tuple[str, str]:
+    # The bot's user ID is fixed for the life of the connection, so build the
+    # two mention forms once instead of formatting them for every message.
+    return f"<@{bot_user_id}>", f"<@!{bot_user_id}>"
+
+
 def _should_respond(message: discord.Message, bot_user_id: int, cfg: BotRuntimeConfig) -> bool:
     if cfg.respond_in_all_channels:
         return True
-    if cfg.allowed_channels and message.channel.id in cfg.allowed_channels:
+    if message.channel.id in cfg.allowed_channels:
         return True
-    return message.content.startswith(f"<@{bot_user_id}>") or message.content.startswith(f"<@!{bot_user_id}>")
+    return message.content.startswith(_mention_tags(bot_user_id))
 
 
 def _clean_prompt(content: str, bot_user_id: int) -> str:
-    prompt = content.replace(f"<@{bot_user_id}>", "").replace(f"<@!{bot_user_id}>", "").strip()
-    return prompt or "Hello ACE. Please share your current status."
+    plain, nick = _mention_tags(bot_user_id)
+    prompt = content.replace(plain, "").replace(nick, "").strip()
+    return prompt or STATUS_PROMPT
+
+
+def _chunk_message(text: str, size: int = DISCORD_CHUNK_SIZE) -> Iterable[str]:
+    """Split text into Discord-sized parts, preferring to break after a newline."""
+    start = 0
+    length = len(text)
+    while length - start > size:
+        # Search from start + 1 so a leading newline never becomes its own part.
+        cut = text.rfind("\n", start + 1, start + size)
+        end = cut + 1 if cut > start else start + size
+        yield text[start:end]
+        start = end
+    if start < length:
+        yield text[start:]
+
+
+class _StreamRelay:
+    """Post streamed model output to a channel as it arrives.
+
+    Text is buffered until it no longer fits in one Discord message, then the
+    full part is sent, ending at the last newline where there is one. A
+    reply that fits in a single message is still sent as one message, and
+    the model banner is never split from the start of the answer.
+    """
+
+    def __init__(self, channel) -> None:
+        self.channel = channel
+        self.buffer = ""
+        self.banner_length = 0
+        self.streamed = False
+        self.sent_any = False
+
+    def begin(self, candidate: Candidate) -> None:
+        # A new candidate starts over; anything buffered from a failed one is dropped.
+        self.buffer = _model_banner(candidate)
+        self.banner_length = len(self.buffer)
+        self.streamed = False
+
+    async def feed(self, text: str) -> None:
+        self.streamed = True
+        self.buffer += text
+        while len(self.buffer) > DISCORD_CHUNK_SIZE:
+            # Keep the banner's own newline out of the search while it leads the buffer.
+            floor = 0 if self.sent_any else self.banner_length
+            cut = self.buffer.rfind("\n", floor, DISCORD_CHUNK_SIZE)
+            end = cut + 1 if cut >= floor else DISCORD_CHUNK_SIZE
+            await self._send(self.buffer[:end])
+            self.buffer = self.buffer[end:]
+
+    async def finish(self) -> None:
+        if len(self.buffer) <= DISCORD_CHUNK_SIZE:
+            await self._send(self.buffer)
+        else:
+            for part in _chunk_message(self.buffer):
+                await self._send(part)
+        self.buffer = ""
+
+    async def _send(self, text: str) -> None:
+        if text.strip():
+            await self.channel.send(text)
+            self.sent_any = True
+
+
+class _StreamInterrupted(ModelCallError):
+    """A candidate failed after part of its answer was already posted."""
+
+
+def _model_banner(candidate: Candidate) -> str:
+    return f"_model: {candidate.provider}/{candidate.model}_\n"
+
+
+async def _handle_request(message: discord.Message, prompt: str, cfg: BotRuntimeConfig) -> None:
+    async with message.channel.typing():
+        try:
+            relay = _StreamRelay(message.channel)
+            answer, selected = await cached_completion(prompt, cfg, relay)
+            if relay.streamed:
+                await relay.finish()
+            else:
+                reply = _model_banner(selected) + answer
+                if len(reply) <= DISCORD_CHUNK_SIZE:
+                    await message.channel.send(reply)
+                else:
+                    for part in _chunk_message(reply):
+                        await message.channel.send(part)
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.exception("Request handling failed")
+            await message.channel.send(
+                "I couldn't complete that request right now. "
+                "Please check provider credentials and try again."
+            )
+            await _dispatch_alert(
+                cfg.alert_webhook,
+                title="ACE Discord Request Failed",
+                description=str(exc),
+                details={"channel_id": message.channel.id, "author": str(message.author)},
+            )
+
+
+async def _dispatch_alert(webhook_url: str, title: str, description: str, details: Dict) -> None:
+    """Hand an alert to the background sender so request handling never waits on the webhook."""
+    if _ALERT_QUEUE is None:
+        await asyncio.to_thread(send_discord_alert, webhook_url, title, description, details)
+        return
+    try:
+        _ALERT_QUEUE.put_nowait((webhook_url, title, description, details))
+    except asyncio.QueueFull:
+        LOGGER.warning("Alert queue full; dropping alert: %s", title)
 
 
-def _chunk_message(text: str, size: int = 1900) -> Iterable[str]:
-    for i in range(0, len(text), size):
-        yield text[i : i + size]
+async def _alert_worker(alerts_q: "asyncio.Queue[Tuple[str, str, str, Dict]]") -> None:
+    while True:
+        webhook_url, title, description, details = await alerts_q.get()
+        try:
+            result = await asyncio.to_thread(send_discord_alert, webhook_url, title, description, details)
+            if not result["ok"]:
+                LOGGER.warning("Alert not delivered: %s", result["message"])
+        except Exception:  # noqa: BLE001
+            LOGGER.exception("Alert worker failed to send an alert")
+        finally:
+            alerts_q.task_done()
+
+
+async def _request_worker(
+    requests_q: "asyncio.Queue[Tuple[discord.Message, str, BotRuntimeConfig]]",
+) -> None:
+    while True:
+        message, prompt, cfg = await requests_q.get()
+        try:
+            await _handle_request(message, prompt, cfg)
+        except Exception:  # noqa: BLE001
+            LOGGER.exception("Request worker failed to deliver a reply")
+        finally:
+            requests_q.task_done()
 
 
 async def run_discord_bot() -> None:
+    global _HTTP_SESSION, _ANTHROPIC_CLIENT, _ALERT_QUEUE
+
     cfg = load_runtime_config()
 
     intents = discord.Intents.default()
@@ -192,6 +491,17 @@ async def run_discord_bot() -> None:
     intents.messages = True
     client = discord.Client(intents=intents)
 
+    def reload_config() -> None:
+        # SIGHUP picks up routing changes in config/providers.json without a restart.
+        nonlocal cfg
+        load_runtime_config.cache_clear()
+        try:
+            cfg = load_runtime_config()
+        except Exception:  # noqa: BLE001
+            LOGGER.exception("Config reload failed; keeping previous settings")
+            return
+        LOGGER.info("Reloaded runtime config: %d candidate(s) for role %s", len(cfg.candidates), cfg.role)
+
     @client.event
     async def on_ready() -> None:
         LOGGER.info("ACE Discord bot is online as %s", client.user)
@@ -205,30 +515,54 @@ async def run_discord_bot() -> None:
             return
 
         prompt = _clean_prompt(message.content, client.user.id)
-        async with message.channel.typing():
-            try:
-                answer, selected = await asyncio.to_thread(complete_with_fallback, prompt, cfg)
-                banner = f"_model: {selected.provider}/{selected.model}_\n"
-                for part in _chunk_message(banner + answer):
-                    await message.channel.send(part)
-            except Exception as exc:  # noqa: BLE001
-                LOGGER.exception("Request handling failed")
-                await message.channel.send(
-                    "I couldn't complete that request right now. "
-                    "Please check provider credentials and try again."
-                )
-                send_discord_alert(
-                    cfg.alert_webhook,
-                    title="ACE Discord Request Failed",
-                    description=str(exc),
-                    details={"channel_id": message.channel.id, "author": str(message.author)},
-                )
+        try:
+            requests_q.put_nowait((message, prompt, cfg))
+        except asyncio.QueueFull:
+            LOGGER.warning("Request queue full; rejecting message in channel %s", message.channel.id)
+            await message.channel.send("I'm handling a lot of requests right now. Please try again in a moment.")
 
-    await client.start(cfg.token)
+    requests_q: "asyncio.Queue[Tuple[discord.Message, str, BotRuntimeConfig]]" = asyncio.Queue(
+        maxsize=REQUEST_QUEUE_SIZE
+    )
+    workers = [asyncio.create_task(_request_worker(requests_q)) for _ in range(REQUEST_WORKERS)]
+    _ALERT_QUEUE = asyncio.Queue(maxsize=ALERT_QUEUE_SIZE)
+    workers.append(asyncio.create_task(_alert_worker(_ALERT_QUEUE)))
+    if hasattr(signal, "SIGHUP"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_config)
+    _HTTP_SESSION = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=75),
+        json_serialize=_json.dumps,
+    )
+    try:
+        await client.start(cfg.token)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        _ALERT_QUEUE = None
+        await _HTTP_SESSION.close()
+        _HTTP_SESSION = None
+        if _ANTHROPIC_CLIENT is not None:
+            await _ANTHROPIC_CLIENT.close()
+            _ANTHROPIC_CLIENT = None
+
+
+def _setup_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue so the event loop never blocks on stderr."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    records: queue.Queue = queue.Queue(-1)
+    enqueue = logging.handlers.QueueHandler(records)
+    # QueueHandler pre-formats the message; leave the layout to the real handler.
+    enqueue.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), handlers=[enqueue])
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
 
 
 def main() -> int:
-    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    listener = _setup_logging()
     try:
         asyncio.run(run_discord_bot())
     except KeyboardInterrupt:
@@ -238,6 +572,8 @@ def main() -> int:
         LOGGER.exception("Fatal startup error")
         print(f"ERROR: {exc}")
         return 1
+    finally:
+        listener.stop()
     return 0
 
 
@@ -2,35 +2,106 @@
 
 from __future__ import annotations
 
-import json
-import urllib.error
-import urllib.request
-from typing import Dict
+import functools
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from src._http import SESSION
+from src._json import dumps_bytes, dumps_pretty
+
+# The envelope never changes, so only the content string is encoded per alert.
+_PAYLOAD_PREFIX = b'{"content":'
+_PAYLOAD_SUFFIX = b"}"
+_HEADERS = {"Content-Type": "application/json"}
+
+ALERT_DEDUP_WINDOW_S = 60.0
+# Token bucket shared by all alerts: short bursts pass, sustained floods are capped.
+ALERT_BURST = 5
+ALERT_REFILL_PER_S = 5 / 60
+
+# Alerts are sent from worker threads, so the limiter state is lock-guarded.
+_LAST_ALERT: Dict[Tuple[str, str], float] = {}
+_LAST_ALERT_LOCK = threading.Lock()
+_tokens = float(ALERT_BURST)
+_tokens_at = time.monotonic()
+
+
+def _admit(title: str, description: str) -> Optional[Dict]:
+    """Return a rejection result if this alert should not be sent, else None.
+
+    Admitting an alert opens its dedup window right away, so concurrent
+    repeats are suppressed while it is in flight; ``_release`` closes the
+    window again and refunds the rate-limit token if the send fails.
+    """
+    global _tokens, _tokens_at
+    now = time.monotonic()
+    key = (title, description)
+    with _LAST_ALERT_LOCK:
+        if now - _LAST_ALERT.get(key, float("-inf")) < ALERT_DEDUP_WINDOW_S:
+            return {"ok": True, "message": "Duplicate alert suppressed."}
+
+        _tokens = min(ALERT_BURST, _tokens + (now - _tokens_at) * ALERT_REFILL_PER_S)
+        _tokens_at = now
+        if _tokens < 1:
+            return {"ok": False, "message": "Discord alert rate limit reached; alert dropped."}
+        _tokens -= 1
+
+        if len(_LAST_ALERT) >= 256:
+            for stale in [k for k, seen in _LAST_ALERT.items() if now - seen >= ALERT_DEDUP_WINDOW_S]:
+                del _LAST_ALERT[stale]
+        _LAST_ALERT[key] = now
+    return None
+
+
+def _release(title: str, description: str) -> None:
+    """Undo ``_admit`` for an alert that was not delivered, so a retry is not suppressed."""
+    global _tokens
+    with _LAST_ALERT_LOCK:
+        _LAST_ALERT.pop((title, description), None)
+        # A failed send did not use webhook quota; don't let an outage drain the bucket.
+        _tokens = min(ALERT_BURST, _tokens + 1)
+
+
+# Alert bodies repeat (the same outage text over and over), so keep the bytes.
+@functools.lru_cache(maxsize=64)
+def _encode_payload(content: str) -> bytes:
+    return b"".join((_PAYLOAD_PREFIX, dumps_bytes(content), _PAYLOAD_SUFFIX))
 
 
 def send_discord_alert(webhook_url: str, title: str, description: str, details: Dict | None = None) -> Dict:
     if not webhook_url:
         return {"ok": False, "message": "Missing Discord webhook URL."}
+    rejected = _admit(title, description)
+    if rejected is not None:
+        return rejected
 
     content = f"**{title}**\n{description}"
     if details:
-        content += "\n```json\n" + json.dumps(details, indent=2) + "\n```"
+        content += "\n```json\n" + dumps_pretty(details) + "\n```"
 
-    payload = json.dumps({"content": content}).encode("utf-8")
-    req = urllib.request.Request(
-        webhook_url,
-        data=payload,
-        method="POST",
-        headers={"Content-Type": "application/json"},
-    )
+    result = _post(webhook_url, _encode_payload(content))
+    if not result["ok"]:
+        _release(title, description)
+    return result
 
+
+def _post(webhook_url: str, payload: bytes) -> Dict:
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            if response.status not in (200, 204):
-                return {"ok": False, "message": f"Discord webhook failed with HTTP {response.status}"}
-    except urllib.error.URLError as exc:
-        return {"ok": False, "message": f"Discord webhook request failed: {exc.reason}"}
-    except TimeoutError:
+        response = SESSION.post(
+            webhook_url,
+            data=payload,
+            headers=_HEADERS,
+            timeout=10,
+        )
+    except requests.Timeout:
         return {"ok": False, "message": "Discord webhook request failed: timeout"}
+    except requests.RequestException as exc:
+        return {"ok": False, "message": f"Discord webhook request failed: {exc}"}
+
+    if response.status_code not in (200, 204):
+        return {"ok": False, "message": f"Discord webhook failed with HTTP {response.status_code}"}
 
     return {"ok": True, "message": "Discord alert sent."}
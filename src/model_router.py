@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
-import json
+import functools
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from src import _json
+
 
 CONFIG_PATH = Path("config/providers.json")
 
+Target = Tuple[str, str]
+RolePlan = Tuple[Target, Tuple[Target, ...]]
+
 
 @dataclass(frozen=True)
 class ResolvedModel:
@@ -24,31 +29,129 @@ class ModelResolutionError(RuntimeError):
     pass
 
 
-def load_config(path: Path = CONFIG_PATH) -> Dict:
-    if not path.exists():
-        raise ModelResolutionError(f"Config file not found: {path}")
+@dataclass
+class _CompiledConfig:
+    """Flattened views of one config dict; role plans are filled in on first use."""
+
+    config: Dict
+    enabled_pairs: frozenset[Target]
+    role_plans: Dict[str, RolePlan] = field(default_factory=dict)
+
+
+def _compile(config: Dict) -> _CompiledConfig:
+    _validate_config(config)
+    providers = config.get("providers", {})
+    return _CompiledConfig(
+        config=config,
+        enabled_pairs=frozenset(
+            (provider, model)
+            for provider, provider_cfg in providers.items()
+            if provider_cfg.get("enabled", False)
+            for model in provider_cfg.get("models", [])
+        ),
+    )
+
+
+def _validate_config(config: Dict) -> None:
+    """Check the shape of the router sections once, before anything is compiled from them."""
+    problems: List[str] = []
+    if not isinstance(config, dict):
+        raise ModelResolutionError("Config must be a JSON object.")
+
+    providers = config.get("providers", {})
+    if not isinstance(providers, dict):
+        problems.append("providers must be an object")
+        providers = {}
+    for name, provider_cfg in providers.items():
+        if not isinstance(provider_cfg, dict):
+            problems.append(f"providers.{name} must be an object")
+            continue
+        if not isinstance(provider_cfg.get("enabled", False), bool):
+            problems.append(f"providers.{name}.enabled must be true or false")
+        models = provider_cfg.get("models", [])
+        if not isinstance(models, list) or not all(isinstance(m, str) for m in models):
+            problems.append(f"providers.{name}.models must be a list of strings")
+
+    roles = config.get("roles", {})
+    if not isinstance(roles, dict):
+        problems.append("roles must be an object")
+        roles = {}
+    for name, role_cfg in roles.items():
+        if not isinstance(role_cfg, dict):
+            problems.append(f"roles.{name} must be an object")
+            continue
+        if not isinstance(role_cfg.get("primary", {}), dict):
+            problems.append(f"roles.{name}.primary must be an object")
+        fallbacks = role_cfg.get("fallbacks", [])
+        if not isinstance(fallbacks, list) or not all(isinstance(f, dict) for f in fallbacks):
+            problems.append(f"roles.{name}.fallbacks must be a list of objects")
+
+    if not isinstance(config.get("defaults", {}), dict):
+        problems.append("defaults must be an object")
+    if not isinstance(config.get("aliases", {}), dict):
+        problems.append("aliases must be an object")
+
+    if problems:
+        raise ModelResolutionError("Invalid config: " + "; ".join(problems))
 
+
+def _parse_config(path: Path) -> Dict:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
+        return _json.loads(path.read_bytes())
+    except _json.JSONDecodeError as exc:
         raise ModelResolutionError(f"Invalid JSON in {path}: {exc}") from exc
 
 
-def _provider_cfg(config: Dict, provider: str) -> Optional[Dict]:
-    return config.get("providers", {}).get(provider)
+@functools.lru_cache(maxsize=8)
+def _load_config_at(path_str: str, mtime_ns: int, size: int) -> Dict:
+    return _parse_config(Path(path_str))
+
+
+@functools.lru_cache(maxsize=8)
+def _compiled_file_at(path_str: str, mtime_ns: int, size: int) -> _CompiledConfig:
+    return _compile(_load_config_at(path_str, mtime_ns, size))
+
+
+def _file_key(path: Path) -> Tuple[str, int, int]:
+    try:
+        st = path.stat()
+    except OSError:
+        raise ModelResolutionError(f"Config file not found: {path}") from None
+    # Size catches a rewrite that lands within the filesystem's mtime granularity.
+    return str(path), st.st_mtime_ns, st.st_size
+
+
+def load_config(path: Path = CONFIG_PATH) -> Dict:
+    """Return the parsed config, reusing it until the file's mtime or size changes."""
+    return _load_config_at(*_file_key(path))
+
+
+def _compiled(config: Optional[Dict]) -> _CompiledConfig:
+    """Compiled view of ``config``, or of CONFIG_PATH when none is given.
+
+    Only the file-backed view is cached, keyed like load_config on
+    (path, mtime, size). A caller-supplied dict may be edited between calls,
+    so it is compiled afresh each time.
+    """
+    if not config:
+        return _compiled_file_at(*_file_key(CONFIG_PATH))
+    return _compile(config)
+
+
+def _model_available(compiled: _CompiledConfig, provider: str, model: str) -> bool:
+    return (provider, model) in compiled.enabled_pairs
 
 
-def _model_available(config: Dict, provider: str, model: str) -> bool:
-    provider_cfg = _provider_cfg(config, provider)
-    if not provider_cfg:
-        return False
-    if not provider_cfg.get("enabled", False):
-        return False
-    return model in provider_cfg.get("models", [])
+def _role_plan(compiled: _CompiledConfig, role: str) -> RolePlan:
+    plans = compiled.role_plans
+    plan = plans.get(role)
+    if plan is None:
+        plan = plans[role] = _build_role_plan(compiled, role)
+    return plan
 
 
-def _role_plan(config: Dict, role: str) -> Tuple[Tuple[str, str], List[Tuple[str, str]]]:
-    role_cfg = config.get("roles", {}).get(role)
+def _build_role_plan(compiled: _CompiledConfig, role: str) -> RolePlan:
+    role_cfg = compiled.config.get("roles", {}).get(role)
     if not role_cfg:
         raise ModelResolutionError(f"Unknown role: {role}")
 
@@ -58,32 +161,62 @@ def _role_plan(config: Dict, role: str) -> Tuple[Tuple[str, str], List[Tuple[str
     if not provider or not model:
         raise ModelResolutionError(f"Role '{role}' is missing a valid primary model.")
 
-    fallbacks: List[Tuple[str, str]] = []
+    # Fallbacks are filtered against the enabled catalog here, once per role,
+    # so resolution only has to take the first entry.
+    enabled_pairs = compiled.enabled_pairs
+    fallbacks: List[Target] = []
     for item in role_cfg.get("fallbacks", []):
-        fallback_provider = item.get("provider")
-        fallback_model = item.get("model")
-        if fallback_provider and fallback_model:
-            fallbacks.append((fallback_provider, fallback_model))
+        target = (item.get("provider"), item.get("model"))
+        if target[0] and target[1] and target in enabled_pairs:
+            fallbacks.append(target)
 
-    return (provider, model), fallbacks
+    return (provider, model), tuple(fallbacks)
 
 
 def _iter_candidates(
-    config: Dict,
+    compiled: _CompiledConfig,
     role: Optional[str],
     requested_provider: Optional[str],
     requested_model: Optional[str],
-) -> Tuple[Tuple[str, str], List[Tuple[str, str]]]:
+) -> RolePlan:
+    defaults = compiled.config.get("defaults", {})
     if requested_provider and requested_model:
-        role_name = role or config.get("defaults", {}).get("role", "ace")
-        _, role_fallbacks = _role_plan(config, role_name)
+        role_name = role or defaults.get("role", "ace")
+        _, role_fallbacks = _role_plan(compiled, role_name)
         return (requested_provider, requested_model), role_fallbacks
 
-    role_name = role or config.get("defaults", {}).get("role")
+    role_name = role or defaults.get("role")
     if not role_name:
         raise ModelResolutionError("No role selected and no defaults.role configured.")
 
-    return _role_plan(config, role_name)
+    return _role_plan(compiled, role_name)
+
+
+def _resolve_plan(
+    compiled: _CompiledConfig,
+    primary: Target,
+    fallbacks: Tuple[Target, ...],
+    effective_role: Optional[str],
+    tried: frozenset[Target] = frozenset(),
+) -> ResolvedModel:
+    provider, model = primary
+    if primary not in tried and _model_available(compiled, provider, model):
+        return ResolvedModel(provider=provider, model=model, role=effective_role)
+
+    if tried:
+        fallbacks = tuple(target for target in fallbacks if target not in tried)
+    if fallbacks:
+        fallback_provider, fallback_model = fallbacks[0]
+        return ResolvedModel(
+            provider=fallback_provider,
+            model=fallback_model,
+            from_fallback=True,
+            role=effective_role,
+        )
+
+    raise ModelResolutionError(
+        f"Requested model unavailable ({provider}/{model}) and no valid fallback found."
+    )
 
 
 def resolve_runtime_model(
@@ -91,35 +224,70 @@ def resolve_runtime_model(
     requested_provider: Optional[str] = None,
     requested_model: Optional[str] = None,
     config: Optional[Dict] = None,
+    tried: Optional[frozenset[Target]] = None,
 ) -> ResolvedModel:
-    cfg = config or load_config()
+    """Resolve the model to use, skipping any (provider, model) pair in ``tried``.
 
-    primary, fallbacks = _iter_candidates(cfg, role, requested_provider, requested_model)
-    provider, model = primary
+    ``tried`` is a frozenset so retry loops can grow it with ``tried | {target}``
+    and hand the same object to every attempt.
+    """
+    assert tried is None or isinstance(tried, frozenset), "tried must be a frozenset of (provider, model) pairs"
+    # Compiling validates the config shape before any lookups.
+    return _resolve(_compiled(config), role, requested_provider, requested_model, tried or frozenset())
 
-    effective_role = role or cfg.get("defaults", {}).get("role")
 
-    if _model_available(cfg, provider, model):
-        return ResolvedModel(provider=provider, model=model, role=effective_role)
+def _resolve(
+    compiled: _CompiledConfig,
+    role: Optional[str],
+    requested_provider: Optional[str],
+    requested_model: Optional[str],
+    tried: frozenset[Target] = frozenset(),
+) -> ResolvedModel:
+    primary, fallbacks = _iter_candidates(compiled, role, requested_provider, requested_model)
+    effective_role = role or compiled.config.get("defaults", {}).get("role")
+    return _resolve_plan(compiled, primary, fallbacks, effective_role, tried)
 
-    for fallback_provider, fallback_model in fallbacks:
-        if _model_available(cfg, fallback_provider, fallback_model):
-            return ResolvedModel(
-                provider=fallback_provider,
-                model=fallback_model,
-                from_fallback=True,
-                role=effective_role,
-            )
 
-    raise ModelResolutionError(
-        f"Requested model unavailable ({provider}/{model}) and no valid fallback found."
-    )
+def prebuild_alias_map(config: Dict) -> Dict[str, ResolvedModel | ModelResolutionError]:
+    """Resolve every configured alias in one pass over the catalog.
+
+    Aliases that share a candidate plan are resolved once. Failures are
+    returned in place of the result so callers can report every alias; an
+    invalid config raises ModelResolutionError before any alias is tried.
+    """
+    compiled = _compile(config)
+    effective_role = config.get("defaults", {}).get("role")
+    by_plan: Dict[Tuple, ResolvedModel | ModelResolutionError] = {}
+    resolved: Dict[str, ResolvedModel | ModelResolutionError] = {}
+
+    for alias_name in config.get("aliases", {}):
+        try:
+            primary, fallbacks = _iter_candidates(compiled, None, None, alias_name)
+        except ModelResolutionError as exc:
+            resolved[alias_name] = exc
+            continue
+
+        plan_key = (primary, fallbacks)
+        if plan_key not in by_plan:
+            try:
+                by_plan[plan_key] = _resolve_plan(compiled, primary, fallbacks, effective_role)
+            except ModelResolutionError as exc:
+                by_plan[plan_key] = exc
+        resolved[alias_name] = by_plan[plan_key]
+
+    return resolved
 
 
 def validate_environment(config: Optional[Dict] = None) -> List[str]:
     """Return a list of preflight issues; empty list means healthy enough to boot."""
-    cfg = config or load_config()
+    try:
+        compiled = _compiled(config)
+    except ModelResolutionError as exc:
+        # A malformed config would fail every role the same way; report it once.
+        return [str(exc)]
+    cfg = compiled.config
     issues: List[str] = []
+    env = os.environ.copy()
 
     providers = cfg.get("providers", {})
     for provider_name, provider_cfg in providers.items():
@@ -127,20 +295,20 @@ def validate_environment(config: Optional[Dict] = None) -> List[str]:
             continue
 
         key_env = provider_cfg.get("requires_key_env")
-        if key_env and not os.getenv(key_env):
+        if key_env and not env.get(key_env):
             issues.append(
                 f"Provider '{provider_name}' enabled but missing env '{key_env}'."
             )
 
         base_url_env = provider_cfg.get("base_url_env")
-        if base_url_env and not os.getenv(base_url_env):
+        if base_url_env and not env.get(base_url_env):
             issues.append(
                 f"Provider '{provider_name}' enabled but missing env '{base_url_env}'."
             )
 
     for role_name in cfg.get("roles", {}):
         try:
-            resolve_runtime_model(role=role_name, config=cfg)
+            _resolve(compiled, role_name, None, None)
         except ModelResolutionError as exc:
             issues.append(f"Role '{role_name}' failed resolution: {exc}")
 
@@ -1,33 +1,200 @@
-"""Helpers for Ollama health checks and model pull operations."""
+"""Helpers for Ollama health checks and model pull operations.
+
+Each helper has an ``*_async`` twin built on a shared aiohttp session, for
+callers that already run an event loop.
+"""
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-import urllib.error
-import urllib.request
-from typing import Dict, List
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
+import aiohttp
+import requests
 
-def health_check(base_url: str, timeout: int = 10) -> Dict:
-    url = f"{base_url.rstrip('/')}/api/tags"
-    try:
-        with urllib.request.urlopen(url, timeout=timeout) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-            models = [m.get("name") for m in payload.get("models", [])]
-            return {"ok": True, "message": "Ollama reachable", "models": models}
-    except urllib.error.URLError as exc:
-        return {"ok": False, "message": f"Ollama unreachable: {exc.reason}", "models": []}
-    except TimeoutError:
-        return {"ok": False, "message": "Ollama unreachable: timeout", "models": []}
+from src import _json
+from src._http import SESSION
 
+LOGGER = logging.getLogger("ollama_manager")
 
-def ensure_models(base_url: str, required_models: List[str], timeout: int = 10) -> Dict:
-    status = health_check(base_url=base_url, timeout=timeout)
-    if not status["ok"]:
-        return {"ok": False, "message": status["message"], "missing_models": required_models}
+# Keep-alive pool for the async helpers; rebuilt if the owning loop changes.
+_SESSION: Optional[aiohttp.ClientSession] = None
+_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+# /api/tags results are reused briefly; liveness rarely flips faster than this
+# and a stale "up" only means the caller's own request fails and falls back.
+HEALTH_CACHE_TTL_S = 2.0
+_HEALTH_CACHE: Dict[str, Tuple[float, Dict]] = {}
+_PROBE_LOCKS: Dict[str, asyncio.Lock] = {}
+_PROBE_LOCKS_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+PULL_LOG_INTERVAL_S = 1.0
+
+PROBE_TIMEOUT_FLOOR_S = 1.0
+PROBE_BACKOFF_CAP_S = 60.0
+
+
+@dataclass
+class _ProbeStats:
+    """Response-time EWMA and failure streak for one Ollama endpoint.
+
+    Once a probe has succeeded, the timeout tracks three times the EWMA
+    (clamped between PROBE_TIMEOUT_FLOOR_S and the caller's timeout). After
+    consecutive failures the endpoint is reported down without a request
+    for 2, 4, 8... seconds, up to PROBE_BACKOFF_CAP_S.
+    """
+
+    ewma: Optional[float] = None
+    fails: int = 0
+    cold_until: float = 0.0
+
+    def cold_status(self) -> Dict | None:
+        if time.monotonic() >= self.cold_until:
+            return None
+        return {
+            "ok": False,
+            "message": f"Ollama unreachable: backing off after {self.fails} failed probe(s)",
+            "models": [],
+        }
+
+    def timeout(self, cap: float) -> float:
+        if self.ewma is None:
+            return cap
+        return min(cap, max(PROBE_TIMEOUT_FLOOR_S, 3 * self.ewma))
+
+    def record(self, ok: bool, elapsed: float) -> None:
+        if ok:
+            self.ewma = elapsed if self.ewma is None else 0.8 * self.ewma + 0.2 * elapsed
+            self.fails = 0
+            self.cold_until = 0.0
+        else:
+            self.fails += 1
+            self.cold_until = time.monotonic() + min(PROBE_BACKOFF_CAP_S, 2**self.fails)
+
+
+_PROBE_STATS: Dict[str, _ProbeStats] = {}
+
+
+def _get_session() -> aiohttp.ClientSession:
+    global _SESSION, _SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _SESSION is None or _SESSION.closed or _SESSION_LOOP is not loop:
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=30),
+            json_serialize=_json.dumps,
+        )
+        _SESSION_LOOP = loop
+    return _SESSION
+
+
+async def close_session() -> None:
+    """Close the shared async session; call before the event loop shuts down."""
+    global _SESSION, _SESSION_LOOP
+    if _SESSION is not None:
+        await _SESSION.close()
+    _SESSION = None
+    _SESSION_LOOP = None
+
+
+def invalidate_ollama_cache(base_url: str | None = None) -> None:
+    """Drop cached health results for ``base_url``, or for every URL."""
+    if base_url is None:
+        _HEALTH_CACHE.clear()
+    else:
+        _HEALTH_CACHE.pop(f"{base_url.rstrip('/')}/api/tags", None)
+
+
+def _cached_health(url: str) -> Dict | None:
+    entry = _HEALTH_CACHE.get(url)
+    if entry is not None and time.monotonic() - entry[0] < HEALTH_CACHE_TTL_S:
+        return _copy_status(entry[1])
+    return None
+
+
+def _store_health(url: str, status: Dict) -> Dict:
+    _HEALTH_CACHE[url] = (time.monotonic(), status)
+    return _copy_status(status)
+
+
+def _copy_status(status: Dict) -> Dict:
+    # Callers get their own dict and model list so the cached entry stays intact.
+    return {**status, "models": list(status["models"])}
+
+
+def _probe_lock(url: str) -> asyncio.Lock:
+    global _PROBE_LOCKS_LOOP
+    loop = asyncio.get_running_loop()
+    if _PROBE_LOCKS_LOOP is not loop:
+        _PROBE_LOCKS.clear()
+        _PROBE_LOCKS_LOOP = loop
+    return _PROBE_LOCKS.setdefault(url, asyncio.Lock())
+
+
+class _PullProgress:
+    """Track the NDJSON status stream that /api/pull emits while it works."""
+
+    def __init__(self, model: str, log: logging.Logger) -> None:
+        self.model = model
+        self.log = log
+        self.succeeded = False
+        self.error: Optional[str] = None
+        self._last_log = float("-inf")
+
+    def feed(self, line: bytes) -> bool:
+        """Record one status line; returns False once the stream has failed."""
+        line = line.strip()
+        if not line:
+            return True
+        try:
+            event = _json.loads(line)
+        except ValueError:
+            event = None
+        if not isinstance(event, dict):
+            self.error = f"unexpected pull output: {line[:200]!r}"
+            return False
+        if "error" in event:
+            self.error = str(event["error"])
+            return False
+
+        status = event.get("status", "")
+        if status == "success":
+            self.succeeded = True
+            return True
+        now = time.monotonic()
+        if now - self._last_log >= PULL_LOG_INTERVAL_S:
+            self._last_log = now
+            total = event.get("total")
+            completed = event.get("completed", 0)
+            if isinstance(total, (int, float)) and total and isinstance(completed, (int, float)):
+                percent = 100 * completed / total
+                self.log.info("Pulling %s: %s (%.0f%%)", self.model, status, percent)
+            else:
+                self.log.info("Pulling %s: %s", self.model, status)
+        return True
 
-    available = set(status.get("models", []))
+    def result(self, base_url: str) -> Dict:
+        if self.error is not None:
+            return {"ok": False, "message": f"Failed to pull '{self.model}': {self.error}"}
+        if not self.succeeded:
+            return {"ok": False, "message": f"Failed to pull '{self.model}': stream ended before success"}
+        self.log.info("Pulled model successfully: %s", self.model)
+        invalidate_ollama_cache(base_url)
+        return {"ok": True, "message": f"Pulled model successfully: {self.model}"}
+
+
+def _parse_tags(body: bytes) -> Dict:
+    try:
+        payload = _json.loads(body)
+        models = [m.get("name") for m in payload.get("models", [])]
+    except (ValueError, AttributeError, TypeError):
+        return {"ok": False, "message": "Ollama unreachable: malformed /api/tags response", "models": []}
+    return {"ok": True, "message": "Ollama reachable", "models": models}
+
+
+def _missing_status(available: set, required_models: List[str]) -> Dict:
     missing = [model for model in required_models if model not in available]
     if missing:
         return {
@@ -38,19 +205,165 @@ def ensure_models(base_url: str, required_models: List[str], timeout: int = 10)
     return {"ok": True, "message": "All required Ollama models are available.", "missing_models": []}
 
 
+def health_check(base_url: str, timeout: int = 10) -> Dict:
+    url = f"{base_url.rstrip('/')}/api/tags"
+    cached = _cached_health(url)
+    if cached is not None:
+        return cached
+    stats = _PROBE_STATS.setdefault(url, _ProbeStats())
+    cold = stats.cold_status()
+    if cold is not None:
+        return cold
+    started = time.monotonic()
+    status = _probe_tags(url, stats.timeout(timeout))
+    stats.record(status["ok"], time.monotonic() - started)
+    return _store_health(url, status)
+
+
+def _probe_tags(url: str, timeout: float) -> Dict:
+    try:
+        response = SESSION.get(url, timeout=timeout)
+    except requests.Timeout:
+        return {"ok": False, "message": "Ollama unreachable: timeout", "models": []}
+    except requests.RequestException as exc:
+        return {"ok": False, "message": f"Ollama unreachable: {exc}", "models": []}
+    if response.status_code != 200:
+        return {"ok": False, "message": f"Ollama unreachable: HTTP {response.status_code}", "models": []}
+    return _parse_tags(response.content)
+
+
+def ensure_models(base_url: str, required_models: List[str], timeout: int = 10) -> Dict:
+    status = health_check(base_url=base_url, timeout=timeout)
+    if not status["ok"]:
+        return {"ok": False, "message": status["message"], "missing_models": required_models}
+
+    return _missing_status(set(status.get("models", [])), required_models)
+
+
 def pull_model(base_url: str, model: str, timeout: int = 300, logger: logging.Logger | None = None) -> Dict:
-    log = logger or logging.getLogger("ollama_manager")
+    log = logger or LOGGER
     url = f"{base_url.rstrip('/')}/api/pull"
-    payload = json.dumps({"name": model}).encode("utf-8")
-    req = urllib.request.Request(url, data=payload, method="POST", headers={"Content-Type": "application/json"})
+    try:
+        # ``timeout`` bounds each read, not the whole download.
+        with SESSION.post(
+            url,
+            data=_json.dumps_bytes({"name": model}),
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+            stream=True,
+        ) as response:
+            if response.status_code != 200:
+                return {"ok": False, "message": f"Failed to pull '{model}'. HTTP {response.status_code}"}
+            progress = _PullProgress(model, log)
+            for line in response.iter_lines():
+                if not progress.feed(line):
+                    break
+            return progress.result(base_url)
+    except requests.Timeout:
+        return {"ok": False, "message": f"Failed to pull '{model}': timeout"}
+    except requests.RequestException as exc:
+        return {"ok": False, "message": f"Failed to pull '{model}': {exc}"}
+
+
+async def health_check_async(base_url: str, timeout: int = 10) -> Dict:
+    url = f"{base_url.rstrip('/')}/api/tags"
+    cached = _cached_health(url)
+    if cached is not None:
+        return cached
+    # Single-flight: concurrent callers wait for one probe and share its result.
+    async with _probe_lock(url):
+        cached = _cached_health(url)
+        if cached is not None:
+            return cached
+        stats = _PROBE_STATS.setdefault(url, _ProbeStats())
+        cold = stats.cold_status()
+        if cold is not None:
+            return cold
+        started = time.monotonic()
+        status = await _probe_tags_async(url, stats.timeout(timeout))
+        stats.record(status["ok"], time.monotonic() - started)
+        return _store_health(url, status)
+
 
+async def _probe_tags_async(url: str, timeout: int) -> Dict:
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as response:
+        async with _get_session().get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status != 200:
+                return {"ok": False, "message": f"Ollama unreachable: HTTP {response.status}", "models": []}
+            body = await response.read()
+    except asyncio.TimeoutError:
+        return {"ok": False, "message": "Ollama unreachable: timeout", "models": []}
+    except aiohttp.ClientError as exc:
+        return {"ok": False, "message": f"Ollama unreachable: {exc}", "models": []}
+    return _parse_tags(body)
+
+
+async def ensure_models_async(base_url: str, required_models: List[str], timeout: int = 10) -> Dict:
+    status = await health_check_async(base_url=base_url, timeout=timeout)
+    if not status["ok"]:
+        return {"ok": False, "message": status["message"], "missing_models": required_models}
+    return _missing_status(set(status.get("models", [])), required_models)
+
+
+async def pull_model_async(
+    base_url: str, model: str, timeout: int = 300, logger: logging.Logger | None = None
+) -> Dict:
+    log = logger or LOGGER
+    url = f"{base_url.rstrip('/')}/api/pull"
+    try:
+        async with _get_session().post(
+            url,
+            json={"name": model},
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=timeout),
+        ) as response:
             if response.status != 200:
                 return {"ok": False, "message": f"Failed to pull '{model}'. HTTP {response.status}"}
-            log.info("Pulled model successfully: %s", model)
-            return {"ok": True, "message": f"Pulled model successfully: {model}"}
-    except urllib.error.URLError as exc:
-        return {"ok": False, "message": f"Failed to pull '{model}': {exc.reason}"}
-    except TimeoutError:
+            progress = _PullProgress(model, log)
+            async for line in response.content:
+                if not progress.feed(line):
+                    break
+            return progress.result(base_url)
+    except asyncio.TimeoutError:
         return {"ok": False, "message": f"Failed to pull '{model}': timeout"}
+    except aiohttp.ClientError as exc:
+        return {"ok": False, "message": f"Failed to pull '{model}': {exc}"}
+
+
+async def pull_missing(
+    base_url: str,
+    required_models: List[str],
+    concurrency: int = 2,
+    timeout: int = 300,
+    logger: logging.Logger | None = None,
+) -> Dict:
+    """Pull every required model that is not yet installed, up to ``concurrency`` at once."""
+    health = await health_check_async(base_url)
+    if not health["ok"]:
+        return {"ok": False, "message": health["message"], "pulled": [], "failed": []}
+    status = _missing_status(set(health["models"]), required_models)
+    missing = status["missing_models"]
+    if not missing:
+        return {"ok": True, "message": status["message"], "pulled": [], "failed": []}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def pull_one(model: str) -> Dict:
+        async with semaphore:
+            return await pull_model_async(base_url, model, timeout=timeout, logger=logger)
+
+    results = await asyncio.gather(*(pull_one(model) for model in missing), return_exceptions=True)
+    pulled: List[str] = []
+    failed: List[Dict] = []
+    for model, result in zip(missing, results):
+        if isinstance(result, BaseException):
+            failed.append({"model": model, "message": f"Failed to pull '{model}': {result}"})
+        elif result["ok"]:
+            pulled.append(model)
+        else:
+            failed.append({"model": model, "message": result["message"]})
+
+    if failed:
+        message = f"Pulled {len(pulled)} of {len(missing)} missing model(s)."
+    else:
+        message = f"Pulled {len(pulled)} missing model(s)."
+    return {"ok": not failed, "message": message, "pulled": pulled, "failed": failed}